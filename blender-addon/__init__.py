@@ -23,12 +23,24 @@ import bpy
 import bmesh
 import json
 import asyncio
+import base64
+import itertools
+import math
+import os
+import tempfile
 import threading
 import time
+import zlib
 import requests
+import numpy as np
+from collections import OrderedDict
+from functools import partial
+from urllib.parse import urljoin
 from bpy.props import StringProperty, IntProperty, FloatProperty, BoolProperty, EnumProperty
 from bpy.types import Panel, Operator, PropertyGroup, AddonPreferences
+from bpy.app.handlers import persistent
 import websocket
+from . import miktos_daemon
 
 # Global variables for connection state
 miktos_agent_connected = False
@@ -36,6 +48,911 @@ current_task_id = None
 generation_progress = 0.0
 generation_status = "idle"
 
+# Full-resolution images currently loaded, least recently viewed first
+full_res_lru = OrderedDict()
+# Full-resolution images the user chose to keep in the viewport
+full_res_pinned = set()
+
+DEFAULT_FULL_RES_MEMORY_CAP_MB = 2048
+
+# Progress of the running parameter sweep, shown in the panel
+sweep_state = None
+
+SWEEP_CELL_SIZE = 256
+# Cells shrink for large sweeps so the float sheet buffer stays at or under 2048x2048
+SWEEP_MAX_SHEET_SIZE = 2048
+MAX_SWEEP_VARIANTS = 256
+SWEEP_TIMEOUT = 3600
+SWEEP_MAX_POLL_ERRORS = 10
+SWEEP_UPLOAD_INTERVAL = 0.5
+
+# Progressive previews: the WebSocket thread hands the newest accepted frame to
+# a decoder thread, which hands decoded pixels to a main-thread timer
+preview_lock = threading.Lock()
+preview_wakeup = threading.Event()
+preview_decoder = None
+preview_pending = None
+preview_decoded = None
+preview_upload_scheduled = False
+preview_interval = 0.5
+preview_last_accepted = 0.0
+preview_started_at = None
+preview_first_frame_seconds = None
+preview_step = None
+preview_assign = False
+# Mesh name -> (material the preview replaced in slot 0, whether the slot existed)
+preview_replaced = {}
+
+PREVIEW_IMAGE_NAME = "Miktos_Preview"
+ATLAS_UV_LAYER = "MiktosAtlas"
+
+
+def load_result_image(miktos_agent_url, entry, name, session=requests):
+    """Load a generated image from a task result entry into bpy.data.images.
+
+    The image is packed into the .blend, since downloads live in the session
+    temp directory that Blender deletes on exit.
+    """
+    image_path = entry.get("image_path")
+    if image_path and os.path.exists(image_path):
+        image = bpy.data.images.load(image_path, check_existing=True)
+        image.name = name
+        image.pack()
+        return image
+
+    image_url = entry.get("image_url")
+    if not image_url:
+        return None
+
+    response = session.get(urljoin(f"{miktos_agent_url}/", image_url), timeout=30)
+    response.raise_for_status()
+
+    extension = os.path.splitext(image_url)[1] or ".png"
+    download_dir = bpy.app.tempdir or tempfile.gettempdir()
+    file_path = os.path.join(download_dir, f"{name}{extension}")
+    with open(file_path, "wb") as f:
+        f.write(response.content)
+
+    image = bpy.data.images.load(file_path)
+    image.name = name
+    image.pack()
+    return image
+
+
+def create_image_material(name, image):
+    """Create a node material with the image wired into the Base Color"""
+    material = bpy.data.materials.new(name=name)
+    material.use_nodes = True
+
+    nodes = material.node_tree.nodes
+    principled = nodes.get("Principled BSDF")
+
+    image_node = nodes.new("ShaderNodeTexImage")
+    image_node.image = image
+    image_node.location = (-400, 300)
+
+    if principled:
+        material.node_tree.links.new(image_node.outputs["Color"], principled.inputs["Base Color"])
+
+    return material
+
+
+def assign_material(obj, material):
+    """Put the material into the object's first material slot"""
+    if obj.data.materials:
+        obj.data.materials[0] = material
+    else:
+        obj.data.materials.append(material)
+
+
+def image_memory_bytes(images):
+    """Approximate in-memory size of images (8-bit RGBA, or float32 RGBA for float buffers)"""
+    total = 0
+    for image in images:
+        bytes_per_channel = 4 if image.is_float else 1
+        total += image.size[0] * image.size[1] * 4 * bytes_per_channel
+    return total
+
+
+def pack_atlas_rects(sizes, atlas_size):
+    """Pack (width, height) rectangles into square atlas pages with first-fit decreasing-height shelves.
+
+    Returns a list of (page, x, y, width, height) in the input order. Rectangles
+    larger than a page are scaled down to fit before packing.
+    """
+    placements = [None] * len(sizes)
+    fitted = []
+    for index, (width, height) in enumerate(sizes):
+        scale = min(1.0, atlas_size / max(width, height))
+        fitted.append((index, max(1, int(width * scale)), max(1, int(height * scale))))
+
+    # Tallest first keeps shelves tight; pages are lists of [y, shelf_height, cursor_x]
+    fitted.sort(key=lambda item: (item[2], item[1]), reverse=True)
+    pages = []
+
+    for index, width, height in fitted:
+        placed = False
+        for page_index, shelves in enumerate(pages):
+            for shelf in shelves:
+                shelf_y, shelf_height, cursor_x = shelf
+                if height <= shelf_height and cursor_x + width <= atlas_size:
+                    placements[index] = (page_index, cursor_x, shelf_y, width, height)
+                    shelf[2] += width
+                    placed = True
+                    break
+            if placed:
+                break
+
+            # Open a new shelf on this page if there is vertical room left
+            top = shelves[-1][0] + shelves[-1][1] if shelves else 0
+            if top + height <= atlas_size:
+                shelves.append([top, height, width])
+                placements[index] = (page_index, 0, top, width, height)
+                placed = True
+                break
+
+        if not placed:
+            pages.append([[0, height, width]])
+            placements[index] = (len(pages) - 1, 0, 0, width, height)
+
+    return placements
+
+
+def read_image_pixels(image, width, height):
+    """Read image pixels as a (height, width, 4) float32 array, rescaling a copy if needed"""
+    source = image
+    if tuple(image.size) != (width, height):
+        source = image.copy()
+        source.scale(width, height)
+
+    channels = source.channels
+    pixels = np.empty(width * height * channels, dtype=np.float32)
+    source.pixels.foreach_get(pixels)
+    pixels = pixels.reshape(height, width, channels)
+
+    if source is not image:
+        bpy.data.images.remove(source)
+
+    if channels == 4:
+        return pixels
+    rgba = np.ones((height, width, 4), dtype=np.float32)
+    rgba[:, :, :min(channels, 3)] = pixels[:, :, :3]
+    if channels == 1:
+        rgba[:, :, 1] = rgba[:, :, 2] = pixels[:, :, 0]
+    return rgba
+
+
+def remap_uvs_to_rect(mesh, u0, v0, u1, v1):
+    """Write the mesh's UVs, squeezed into the given atlas rectangle, to the dedicated atlas UV layer.
+
+    The source is the active UV layer (or the first other layer if the atlas
+    layer is active), which is left untouched, so reapplying an atlas starts
+    from the original layout each time.
+    """
+    source = mesh.uv_layers.active
+    if source is None or source.name == ATLAS_UV_LAYER:
+        source = next((layer for layer in mesh.uv_layers if layer.name != ATLAS_UV_LAYER), None)
+    if source is None:
+        return False
+    source_name = source.name
+
+    target = mesh.uv_layers.get(ATLAS_UV_LAYER)
+    if target is None:
+        active_index = mesh.uv_layers.active_index
+        target = mesh.uv_layers.new(name=ATLAS_UV_LAYER, do_init=False)
+        mesh.uv_layers.active_index = active_index
+        if target is None:
+            return False
+        # Adding a layer reallocates the mesh's CustomData, so earlier layer references dangle
+        target = mesh.uv_layers[ATLAS_UV_LAYER]
+    source = mesh.uv_layers[source_name]
+
+    uvs = np.empty(len(source.data) * 2, dtype=np.float32)
+    source.data.foreach_get("uv", uvs)
+    # An atlas rect cannot tile, so the atlas copy is clamped to the unit square
+    uvs = np.clip(uvs.reshape(-1, 2), 0.0, 1.0)
+    uvs[:, 0] = u0 + uvs[:, 0] * (u1 - u0)
+    uvs[:, 1] = v0 + uvs[:, 1] * (v1 - v0)
+    target.data.foreach_set("uv", uvs.ravel())
+    mesh.update()
+    return True
+
+
+def use_atlas_uv_layer(material):
+    """Drive the material's image nodes from the atlas UV layer"""
+    nodes = material.node_tree.nodes
+    uv_node = nodes.new("ShaderNodeUVMap")
+    uv_node.uv_map = ATLAS_UV_LAYER
+    uv_node.location = (-600, 300)
+    for node in nodes:
+        if node.type == 'TEX_IMAGE':
+            material.node_tree.links.new(uv_node.outputs["UV"], node.inputs["Vector"])
+
+
+def apply_atlas_textures(objects, object_images, atlas_size, padding, name_prefix):
+    """Pack per-object images into shared atlas pages and map each object into them.
+
+    object_images maps object name to its generated image. Each mesh gets a
+    dedicated atlas UV layer that the atlas materials sample. Objects sharing a mesh
+    datablock are remapped once and take the first image packed for that mesh.
+    Returns the created atlas materials.
+    """
+    meshes = {}
+    for obj in objects:
+        image = object_images.get(obj.name)
+        if image is not None and obj.data.name not in meshes:
+            meshes[obj.data.name] = (obj.data, image)
+
+    if not meshes:
+        return []
+
+    entries = list(meshes.values())
+    sizes = [(image.size[0] + 2 * padding, image.size[1] + 2 * padding) for _, image in entries]
+    placements = pack_atlas_rects(sizes, atlas_size)
+
+    page_count = max(page for page, _, _, _, _ in placements) + 1
+    mesh_pages = {}
+    materials = []
+
+    # Fill, upload and drop one page at a time so only one float page buffer is alive
+    for page_index in range(page_count):
+        pixels_page = np.zeros((atlas_size, atlas_size, 4), dtype=np.float32)
+
+        for (mesh, image), (page, x, y, width, height) in zip(entries, placements):
+            if page != page_index:
+                continue
+            inner_w = max(1, width - 2 * padding)
+            inner_h = max(1, height - 2 * padding)
+            pixels = read_image_pixels(image, inner_w, inner_h)
+            if padding:
+                # Edge-extend so mip filtering does not bleed neighbouring rects into seams
+                pixels = np.pad(pixels, ((padding, padding), (padding, padding), (0, 0)), mode="edge")
+            pixels_page[y:y + pixels.shape[0], x:x + pixels.shape[1]] = pixels
+
+            # Inset by half a texel so bilinear samples stay inside the rect
+            u0 = (x + padding + 0.5) / atlas_size
+            v0 = (y + padding + 0.5) / atlas_size
+            u1 = (x + padding + inner_w - 0.5) / atlas_size
+            v1 = (y + padding + inner_h - 0.5) / atlas_size
+            if not remap_uvs_to_rect(mesh, u0, v0, u1, v1):
+                print(f"Mesh '{mesh.name}' has no UV layer, atlas rect not applied")
+            mesh_pages[mesh.name] = page
+
+        atlas = bpy.data.images.new(f"{name_prefix}_Atlas_{page_index}", atlas_size, atlas_size, alpha=True)
+        atlas.pixels.foreach_set(pixels_page.ravel())
+        del pixels_page
+        atlas.pack()
+        material = create_image_material(f"{name_prefix}_Atlas_{page_index}", atlas)
+        use_atlas_uv_layer(material)
+        materials.append(material)
+
+    for obj in objects:
+        page = mesh_pages.get(obj.data.name)
+        if page is not None:
+            assign_material(obj, materials[page])
+
+    return materials
+
+
+def label_uv_islands(loop_vertices, loop_uvs, loop_totals):
+    """Label polygons by UV island; polygons sharing a vertex with the same UV are connected.
+
+    Uses vectorised union-find (hook roots to the smaller root, then pointer
+    jumping) so half a million faces label in a handful of NumPy passes.
+    Returns (labels per polygon, island count).
+    """
+    poly_count = len(loop_totals)
+    if poly_count == 0:
+        return np.zeros(0, dtype=np.int64), 0
+
+    poly_of_loop = np.repeat(np.arange(poly_count), loop_totals)
+    keys = (
+        (loop_vertices.astype(np.int64) << 32)
+        | (loop_uvs[:, 0].astype(np.int64) << 16)
+        | loop_uvs[:, 1].astype(np.int64)
+    )
+    order = np.argsort(keys, kind="stable")
+    shared = keys[order[1:]] == keys[order[:-1]]
+    a = poly_of_loop[order[:-1][shared]]
+    b = poly_of_loop[order[1:][shared]]
+
+    parent = np.arange(poly_count)
+    while True:
+        root_a = parent[a]
+        root_b = parent[b]
+        differ = root_a != root_b
+        if not differ.any():
+            break
+        np.minimum.at(parent, np.maximum(root_a, root_b)[differ], np.minimum(root_a, root_b)[differ])
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+    roots, labels = np.unique(parent, return_inverse=True)
+    return labels, len(roots)
+
+
+def smallest_uint_dtype(max_value):
+    """Smallest unsigned dtype that can hold max_value"""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.uint64
+
+
+def extract_mesh_context(mesh):
+    """Extract quantized UVs, polygon sizes, UV island labels and stats for one mesh"""
+    vertex_count = len(mesh.vertices)
+    loop_count = len(mesh.loops)
+    poly_count = len(mesh.polygons)
+
+    loop_totals = np.empty(poly_count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    areas = np.empty(poly_count, dtype=np.float32)
+    mesh.polygons.foreach_get("area", areas)
+    loop_vertices = np.empty(loop_count, dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vertices)
+
+    stats = {
+        "vertex_count": vertex_count,
+        "face_count": poly_count,
+        "loop_count": loop_count,
+        "surface_area": float(areas.sum(dtype=np.float64)),
+        "uv_layer": None,
+        "island_count": 0,
+    }
+    arrays = {"loop_totals": loop_totals.astype(smallest_uint_dtype(int(loop_totals.max(initial=0))))}
+
+    uv_layer = mesh.uv_layers.active
+    if uv_layer is None or loop_count == 0:
+        return stats, arrays
+
+    uvs = np.empty(loop_count * 2, dtype=np.float32)
+    uv_layer.data.foreach_get("uv", uvs)
+    uvs = uvs.reshape(-1, 2)
+
+    # Quantize to 16 bits within the UV bounds so tiled layouts survive
+    uv_min = uvs.min(axis=0)
+    uv_range = np.maximum(uvs.max(axis=0) - uv_min, 1e-8)
+    quantized = np.round((uvs - uv_min) / uv_range * 65535.0).astype(np.uint16)
+
+    labels, island_count = label_uv_islands(loop_vertices, quantized, loop_totals)
+
+    stats["uv_layer"] = uv_layer.name
+    stats["uv_min"] = uv_min.tolist()
+    stats["uv_max"] = (uv_min + uv_range).tolist()
+    stats["island_count"] = island_count
+    arrays["uv"] = quantized
+    arrays["island_ids"] = labels.astype(smallest_uint_dtype(max(island_count - 1, 0)))
+    return stats, arrays
+
+
+def build_geometry_context(objects):
+    """Build the geometry manifest and zlib-compressed binary blob for the target objects.
+
+    Meshes shared between objects are extracted once. The manifest records the
+    offset, dtype and shape of every array inside the decompressed blob.
+    """
+    start = time.perf_counter()
+    manifest = {"meshes": {}, "objects": {}, "encoding": "zlib"}
+    chunks = []
+    offset = 0
+
+    for obj in objects:
+        mesh = obj.data
+        manifest["objects"][obj.name] = {
+            "mesh": mesh.name,
+            "dimensions": list(obj.dimensions),
+        }
+        if mesh.name in manifest["meshes"]:
+            continue
+
+        stats, arrays = extract_mesh_context(mesh)
+        stats["arrays"] = {}
+        for key, array in arrays.items():
+            data = np.ascontiguousarray(array).tobytes()
+            stats["arrays"][key] = {
+                "offset": offset,
+                "nbytes": len(data),
+                "dtype": array.dtype.str,
+                "shape": list(array.shape),
+            }
+            chunks.append(data)
+            offset += len(data)
+        manifest["meshes"][mesh.name] = stats
+
+    blob = zlib.compress(b"".join(chunks), 6)
+    manifest["raw_bytes"] = offset
+    manifest["compressed_bytes"] = len(blob)
+    manifest["extract_seconds"] = round(time.perf_counter() - start, 4)
+    return manifest, blob
+
+
+def make_viewport_proxy(image, max_size):
+    """Create a downscaled, packed copy of image for viewport display.
+
+    The full-resolution image is packed and keeps a fake user so it survives a
+    save and reopen while only the proxy is linked into materials; its buffers
+    are freed until needed.
+    Images already within max_size are returned unchanged.
+    """
+    width, height = image.size
+    scale = max_size / max(width, height, 1)
+    if scale >= 1.0:
+        return image
+
+    proxy = image.copy()
+    proxy.scale(max(1, int(width * scale)), max(1, int(height * scale)))
+    proxy.name = f"{image.name}_proxy"
+    proxy.pack()
+
+    proxy["miktos_full_res"] = image.name
+    image["miktos_proxy"] = proxy.name
+    image.use_fake_user = True
+    if not image.packed_file:
+        image.pack()
+    image.buffers_free()
+    return proxy
+
+
+def use_viewport_proxies(materials, max_size):
+    """Swap the image nodes of the materials to viewport proxies"""
+    for material in materials:
+        for node in material.node_tree.nodes:
+            if node.type == 'TEX_IMAGE' and node.image:
+                node.image = make_viewport_proxy(node.image, max_size)
+
+
+def iter_image_nodes(materials=None):
+    """Yield every image texture node of the given (or all) node materials"""
+    for material in materials if materials is not None else bpy.data.materials:
+        if material and material.use_nodes and material.node_tree:
+            for node in material.node_tree.nodes:
+                if node.type == 'TEX_IMAGE' and node.image:
+                    yield node
+
+
+def show_full_res(nodes):
+    """Point proxy image nodes at their full-resolution images, loading them lazily"""
+    for node in nodes:
+        full_name = node.image.get("miktos_full_res")
+        full = bpy.data.images.get(full_name) if full_name else None
+        if full:
+            node.image = full
+            full_res_lru[full.name] = time.time()
+            full_res_lru.move_to_end(full.name)
+
+
+def show_proxies(nodes, keep_pinned=True):
+    """Point full-resolution image nodes back at their viewport proxies"""
+    for node in nodes:
+        if keep_pinned and node.image.name in full_res_pinned:
+            continue
+        proxy_name = node.image.get("miktos_proxy")
+        proxy = bpy.data.images.get(proxy_name) if proxy_name else None
+        if proxy:
+            node.image = proxy
+
+
+def full_res_memory_cap():
+    """Memory cap for loaded full-resolution images in bytes"""
+    addon = bpy.context.preferences.addons.get(__name__)
+    cap_mb = addon.preferences.full_res_memory_cap if addon else DEFAULT_FULL_RES_MEMORY_CAP_MB
+    return cap_mb * 2**20
+
+
+def evict_full_res(cap_bytes):
+    """Free least recently viewed full-resolution images until the loaded total fits the cap"""
+    loaded = [bpy.data.images.get(name) for name in full_res_lru]
+    total = image_memory_bytes(image for image in loaded if image and image.has_data)
+
+    for name in list(full_res_lru):
+        if total <= cap_bytes:
+            break
+        image = bpy.data.images.get(name)
+        del full_res_lru[name]
+        full_res_pinned.discard(name)
+        if image is None:
+            continue
+
+        show_proxies([node for node in iter_image_nodes() if node.image == image], keep_pinned=False)
+        if image.has_data:
+            total -= image_memory_bytes([image])
+            image.buffers_free()
+
+
+@persistent
+def miktos_render_pre(scene, *args):
+    """Render with full-resolution textures"""
+    show_full_res(list(iter_image_nodes()))
+
+
+@persistent
+def miktos_render_complete(scene, *args):
+    """Return to viewport proxies once a render (or whole animation) ends and enforce the memory cap"""
+    show_proxies(list(iter_image_nodes()))
+    evict_full_res(full_res_memory_cap())
+
+
+def get_agent_session(prefs):
+    """Route agent HTTP traffic through the local daemon when one is running for the same agent"""
+    if prefs.use_local_daemon and miktos_daemon.daemon_available(agent_url=prefs.miktos_agent_url):
+        return miktos_daemon.DaemonSession()
+    return requests
+
+
+def parse_sweep_values(text, cast):
+    """Parse a comma-separated sweep list; "start:stop:step" items expand to an inclusive range"""
+    values = []
+    for item in text.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        if ":" not in item:
+            values.append(cast(item))
+            continue
+
+        parts = [cast(part) for part in item.split(":")]
+        if len(parts) != 3 or parts[2] <= 0:
+            raise ValueError(f"Range '{item}' must be start:stop:step with a positive step")
+        start, stop, step = parts
+        count = int(math.floor((stop - start) / step + 1e-9)) + 1
+        values.extend(cast(round(start + i * step, 6)) for i in range(max(count, 0)))
+    return values
+
+
+def build_sweep_variants(props):
+    """Expand the sweep fields into the list of parameter variants (the full grid)"""
+    prompts = [prompt.strip() for prompt in props.sweep_prompts.split("|") if prompt.strip()] or [props.prompt]
+    steps = parse_sweep_values(props.sweep_steps, int) or [props.steps]
+    cfgs = parse_sweep_values(props.sweep_cfg, float) or [props.cfg]
+    seeds = parse_sweep_values(props.sweep_seeds, int) or [None]
+
+    variants = []
+    for prompt, step_count, cfg, seed in itertools.product(prompts, steps, cfgs, seeds):
+        variant = {"prompt": prompt, "steps": step_count, "cfg": cfg}
+        if seed is not None:
+            variant["seed"] = seed
+        variants.append(variant)
+    return variants
+
+
+def contact_sheet_layout(count):
+    """Return (columns, rows, cell_size) for a near-square sheet of count cells"""
+    columns = math.ceil(math.sqrt(count))
+    rows = math.ceil(count / columns)
+    cell_size = max(64, min(SWEEP_CELL_SIZE, SWEEP_MAX_SHEET_SIZE // columns))
+    return columns, rows, cell_size
+
+
+def paste_contact_sheet_cell(sheet_pixels, columns, rows, cell_size, index, image):
+    """Copy a downscaled image into its grid cell, filling the sheet from the top-left"""
+    cell = read_image_pixels(image, cell_size, cell_size)
+    row, column = divmod(index, columns)
+    # Blender images start at the bottom-left
+    y = (rows - 1 - row) * cell_size
+    x = column * cell_size
+    sheet_pixels[y:y + cell_size, x:x + cell_size] = cell
+
+
+def upload_contact_sheet(state):
+    """Timer callback: push the sweep's sheet buffer to its image once for all cells pasted since the last push"""
+    state["sheet_upload_scheduled"] = False
+    sheet = bpy.data.images.get(state["sheet"])
+    if sheet and state.get("sheet_pixels") is not None:
+        sheet.pixels.foreach_set(state["sheet_pixels"].ravel())
+        sheet.update()
+    return None
+
+
+def reset_previews(interval, assign):
+    """Start preview bookkeeping for a new generation"""
+    global preview_pending, preview_decoded, preview_interval, preview_last_accepted
+    global preview_started_at, preview_first_frame_seconds, preview_step, preview_assign
+    
+    with preview_lock:
+        preview_pending = None
+        preview_decoded = None
+        preview_interval = interval
+        preview_last_accepted = 0.0
+        preview_started_at = time.monotonic()
+        preview_first_frame_seconds = None
+        preview_step = None
+        preview_assign = assign
+        preview_replaced.clear()
+
+
+def receive_preview_frame(frame):
+    """Accept an encoded preview frame from the WebSocket thread, dropping frames that arrive too fast"""
+    global preview_pending, preview_last_accepted, preview_decoder
+    
+    now = time.monotonic()
+    with preview_lock:
+        if now - preview_last_accepted < preview_interval:
+            return False
+        preview_last_accepted = now
+        # Only the newest frame matters; an undecoded older one is simply replaced
+        preview_pending = frame
+        
+        if preview_decoder is None:
+            preview_decoder = threading.Thread(target=preview_decoder_loop, daemon=True)
+            preview_decoder.start()
+    
+    preview_wakeup.set()
+    return True
+
+
+def decode_preview_frame(frame):
+    """Decode a zlib-compressed 8-bit RGBA frame into flat float pixels in Blender row order"""
+    width = int(frame["width"])
+    height = int(frame["height"])
+    raw = zlib.decompress(base64.b64decode(frame["data"]))
+    pixels = np.frombuffer(raw, dtype=np.uint8).reshape(height, width, 4)
+    # Frames arrive top row first; Blender images start at the bottom
+    pixels = pixels[::-1].astype(np.float32) / 255.0
+    return width, height, frame.get("step"), pixels.ravel()
+
+
+def preview_decoder_loop():
+    """Decode preview frames off the main thread and schedule their upload"""
+    global preview_pending, preview_decoded, preview_upload_scheduled
+    
+    while True:
+        preview_wakeup.wait()
+        with preview_lock:
+            frame = preview_pending
+            preview_pending = None
+            preview_wakeup.clear()
+        if frame is None:
+            continue
+        
+        if frame.get("encoding", "rgba8+zlib") != "rgba8+zlib":
+            print(f"Unsupported preview encoding: {frame.get('encoding')}")
+            continue
+        
+        try:
+            decoded = decode_preview_frame(frame)
+        except Exception as e:
+            print(f"Preview decode error: {e}")
+            continue
+        
+        with preview_lock:
+            preview_decoded = decoded
+            schedule = not preview_upload_scheduled
+            preview_upload_scheduled = True
+        if schedule:
+            bpy.app.timers.register(upload_preview_frame)
+
+
+def upload_preview_frame():
+    """Write the newest decoded frame into the single reused preview image"""
+    global preview_decoded, preview_upload_scheduled, preview_first_frame_seconds, preview_step
+    
+    with preview_lock:
+        decoded = preview_decoded
+        preview_decoded = None
+        preview_upload_scheduled = False
+    if decoded is None or generation_status in ["completed", "error"]:
+        return None
+    
+    width, height, step, pixels = decoded
+    try:
+        image = bpy.data.images.get(PREVIEW_IMAGE_NAME)
+        if image is None:
+            image = bpy.data.images.new(PREVIEW_IMAGE_NAME, width, height, alpha=True)
+        elif tuple(image.size) != (width, height):
+            # Reallocates only when the agent changes preview resolution
+            image.scale(width, height)
+        
+        image.pixels.foreach_set(pixels)
+        image.update()
+        preview_step = step
+        
+        if preview_first_frame_seconds is None:
+            preview_first_frame_seconds = time.monotonic() - preview_started_at
+            if preview_assign:
+                material = bpy.data.materials.get(PREVIEW_IMAGE_NAME) or create_image_material(PREVIEW_IMAGE_NAME, image)
+                for obj in bpy.context.view_layer.objects.selected:
+                    if obj.type == 'MESH':
+                        if obj.data.name not in preview_replaced:
+                            materials = obj.data.materials
+                            preview_replaced[obj.data.name] = (materials[0] if materials else None, bool(materials))
+                        assign_material(obj, material)
+            print(
+                f"First preview after {preview_first_frame_seconds:.2f}s "
+                f"({width}x{height}, {image_memory_bytes([image]) / 2**10:.0f} KiB preview image)"
+            )
+        
+        for area in bpy.context.screen.areas if bpy.context.screen else []:
+            if area.type in ('PROPERTIES', 'VIEW_3D', 'IMAGE_EDITOR'):
+                area.tag_redraw()
+        
+    except Exception as e:
+        print(f"Failed to update preview: {e}")
+    
+    return None
+
+
+def restore_preview_materials():
+    """Put back the materials the preview replaced and release the preview image once the task is over"""
+    preview_material = bpy.data.materials.get(PREVIEW_IMAGE_NAME)
+    
+    for mesh_name, (original, had_slot) in preview_replaced.items():
+        mesh = bpy.data.meshes.get(mesh_name)
+        if mesh is None or not mesh.materials or mesh.materials[0] != preview_material:
+            # Gone, or already replaced by something else
+            continue
+        if had_slot:
+            mesh.materials[0] = original
+        else:
+            mesh.materials.pop(index=0)
+    
+    preview_replaced.clear()
+    
+    # Nothing should keep a finished task's preview alive; the next task allocates its own
+    if preview_material and preview_material.users == 0:
+        bpy.data.materials.remove(preview_material)
+    preview_image = bpy.data.images.get(PREVIEW_IMAGE_NAME)
+    if preview_image:
+        if preview_image.users == 0:
+            bpy.data.images.remove(preview_image)
+        else:
+            preview_image.buffers_free()
+    return None
+
+
+def build_workflow_data(scene, props, objects):
+    """Build the generation request body for the given mesh objects"""
+    workflow_data = {
+        "workflow_type": "Basic 3D Content" if props.workflow_type == "basic_content" else "Advanced 3D Scene",
+        "parameters": {
+            "prompt": props.prompt,
+            "negative_prompt": props.negative_prompt,
+            "width": props.width,
+            "height": props.height,
+            "steps": props.steps,
+            "cfg": props.cfg,
+        },
+        "blender_info": {
+            "blender_version": f"{bpy.app.version[0]}.{bpy.app.version[1]}",
+            "render_engine": scene.render.engine,
+            "selected_objects": len(objects)
+        }
+    }
+    
+    if props.show_previews:
+        # Let the agent push low-resolution frames while it generates
+        workflow_data["preview"] = {"encoding": "rgba8+zlib", "min_interval": props.preview_interval}
+    
+    if props.use_atlas:
+        # Ask for one texture per object; they are packed into atlases on apply
+        workflow_data["parameters"]["per_object"] = True
+        workflow_data["blender_info"]["target_objects"] = [obj.name for obj in objects]
+    
+    return workflow_data
+
+
+def submit_generation(miktos_agent_url, scene, props, objects, session=requests):
+    """POST a generation request for the objects and return the HTTP response"""
+    workflow_data = build_workflow_data(scene, props, objects)
+    endpoint = f"{miktos_agent_url}/api/v1/blender/generate-content"
+    
+    if not props.include_geometry_context:
+        # Execute workflow via Blender-specific endpoint
+        return session.post(endpoint, json=workflow_data, timeout=10)
+    
+    # UV/geometry arrays travel as one binary part next to the JSON request
+    manifest, blob = build_geometry_context(objects)
+    workflow_data["blender_info"]["geometry_context"] = manifest
+    
+    face_count = sum(mesh["face_count"] for mesh in manifest["meshes"].values())
+    print(
+        f"Geometry context: {len(manifest['meshes'])} meshes, {face_count} faces, "
+        f"{manifest['raw_bytes'] / 2**20:.2f} MiB raw -> {len(blob) / 2**20:.2f} MiB compressed, "
+        f"extracted in {manifest['extract_seconds']:.3f}s"
+    )
+    
+    return session.post(
+        endpoint,
+        files={
+            "request": (None, json.dumps(workflow_data), "application/json"),
+            "geometry": ("geometry.bin", blob, "application/octet-stream"),
+        },
+        timeout=30
+    )
+
+
+def wait_for_task(miktos_agent_url, task_id, session=requests, poll_interval=1.0, timeout=None, on_update=None):
+    """Poll a task until it completes or errors and return the final task data.
+
+    on_update is called with every task payload received. Raises TimeoutError
+    if timeout seconds pass without the task finishing.
+    """
+    deadline = time.monotonic() + timeout if timeout else None
+    
+    while True:
+        response = session.get(f"{miktos_agent_url}/api/v1/task/{task_id}", timeout=10)
+        if response.status_code == 200:
+            task_data = response.json()
+            if on_update:
+                on_update(task_data)
+            if task_data.get("status") in ["completed", "error"]:
+                return task_data
+        
+        if deadline and time.monotonic() > deadline:
+            raise TimeoutError(f"Task {task_id} did not finish within {timeout}s")
+        time.sleep(poll_interval)
+
+
+def apply_task_result(objects, props, miktos_agent_url, task_data, session=requests):
+    """Apply a completed task's texture(s) to the objects and return the materials used"""
+    if not objects:
+        return []
+    
+    result = task_data.get("result") or {}
+    material_name = f"Miktos_AI_{int(time.time())}"
+    
+    if props.use_atlas and result.get("object_textures"):
+        materials = apply_atlas_result(objects, props, miktos_agent_url, result["object_textures"], material_name, session)
+        if props.use_proxy_textures:
+            use_viewport_proxies(materials, props.proxy_size)
+        return materials
+    
+    image = load_result_image(miktos_agent_url, result, material_name, session)
+    if image and props.use_proxy_textures:
+        image = make_viewport_proxy(image, props.proxy_size)
+    
+    if image:
+        material = create_image_material(material_name, image)
+    else:
+        # No texture in the result, fall back to a placeholder material
+        material = bpy.data.materials.new(name=material_name)
+        material.use_nodes = True
+        principled = material.node_tree.nodes.get("Principled BSDF")
+        if principled:
+            principled.inputs["Base Color"].default_value = (0.8, 0.6, 0.4, 1.0)  # Placeholder color
+    
+    # Apply material to the objects
+    for obj in objects:
+        assign_material(obj, material)
+    
+    print(f"Applied AI-generated material '{material_name}' to {len(objects)} objects")
+    return [material]
+
+
+def apply_atlas_result(objects, props, miktos_agent_url, object_textures, name_prefix, session=requests):
+    """Pack per-object results into atlas pages shared by the objects"""
+    materials_before = len(bpy.data.materials)
+    object_images = {}
+    for entry in object_textures:
+        image = load_result_image(miktos_agent_url, entry, f"{name_prefix}_{entry.get('object')}", session)
+        if image:
+            object_images[entry.get("object")] = image
+    source_memory = image_memory_bytes(object_images.values())
+    
+    materials = apply_atlas_textures(
+        objects, object_images, int(props.atlas_size), props.atlas_padding, name_prefix
+    )
+    atlas_memory = image_memory_bytes(
+        node.image for material in materials for node in material.node_tree.nodes
+        if node.type == 'TEX_IMAGE' and node.image
+    )
+    
+    # Per-object images now live in the atlases
+    for image in object_images.values():
+        bpy.data.images.remove(image)
+    
+    print(
+        f"Packed {len(object_images)} textures into {len(materials)} atlas pages: "
+        f"{len(object_images)} materials -> {len(materials)} "
+        f"(scene total {materials_before} -> {len(bpy.data.materials)}), "
+        f"image memory {source_memory / 2**20:.1f} MiB -> {atlas_memory / 2**20:.1f} MiB"
+    )
+    return materials
+
+
 class MiktosAddonPreferences(AddonPreferences):
     """Addon preferences for Miktos Agent connection settings"""
     bl_idname = __name__
@@ -57,12 +974,28 @@ class MiktosAddonPreferences(AddonPreferences):
         description="Automatically connect to Miktos Agent on startup",
         default=True,
     )
+    
+    use_local_daemon = BoolProperty(
+        name="Use Local Daemon",
+        description="Share one agent connection with other Blender instances through miktos_daemon.py when it is running",
+        default=True,
+    )
+    
+    full_res_memory_cap = IntProperty(
+        name="Full-Res Memory Cap (MB)",
+        description="Full-resolution textures beyond this are freed, least recently viewed first",
+        default=DEFAULT_FULL_RES_MEMORY_CAP_MB,
+        min=64,
+        max=65536,
+    )
 
     def draw(self, context):
         layout = self.layout
         layout.prop(self, "miktos_agent_url")
         layout.prop(self, "websocket_url")
         layout.prop(self, "auto_connect")
+        layout.prop(self, "use_local_daemon")
+        layout.prop(self, "full_res_memory_cap")
 
 
 class Miktos3DContentProperties(PropertyGroup):
@@ -132,6 +1065,90 @@ class Miktos3DContentProperties(PropertyGroup):
         description="Automatically apply generated content to scene",
         default=True,
     )
+    
+    show_previews = BoolProperty(
+        name="Live Previews",
+        description="Show low-resolution preview frames on the selected objects while generating",
+        default=True,
+    )
+    
+    preview_interval = FloatProperty(
+        name="Preview Interval",
+        description="Minimum seconds between displayed preview frames",
+        default=0.5,
+        min=0.1,
+        max=10.0,
+    )
+    
+    include_geometry_context = BoolProperty(
+        name="Send UV Context",
+        description="Attach UV islands and geometry stats of the selected meshes to the request",
+        default=False,
+    )
+    
+    use_atlas = BoolProperty(
+        name="Texture Atlas",
+        description="Generate one texture per object and pack them into shared atlas images",
+        default=False,
+    )
+    
+    atlas_size = EnumProperty(
+        name="Atlas Size",
+        description="Resolution of each atlas page",
+        items=[
+            ("2048", "2048", "2048 x 2048 atlas pages"),
+            ("4096", "4096", "4096 x 4096 atlas pages"),
+            ("8192", "8192", "8192 x 8192 atlas pages"),
+        ],
+        default="4096",
+    )
+    
+    atlas_padding = IntProperty(
+        name="Atlas Padding",
+        description="Edge-extended border in pixels around each packed texture",
+        default=4,
+        min=0,
+        max=64,
+    )
+    
+    sweep_prompts = StringProperty(
+        name="Prompt Variants",
+        description="Prompt variants separated by '|' (empty uses the main prompt)",
+        default="",
+        maxlen=2000,
+    )
+    
+    sweep_steps = StringProperty(
+        name="Steps",
+        description="Comma-separated steps values or start:stop:step ranges, e.g. 10:30:10",
+        default="10, 20, 30",
+    )
+    
+    sweep_cfg = StringProperty(
+        name="CFG",
+        description="Comma-separated CFG values or start:stop:step ranges, e.g. 5:9:2",
+        default="5, 7, 9",
+    )
+    
+    sweep_seeds = StringProperty(
+        name="Seeds",
+        description="Comma-separated seeds or start:stop:step ranges (empty lets the agent pick)",
+        default="",
+    )
+    
+    use_proxy_textures = BoolProperty(
+        name="Viewport Proxies",
+        description="Show downscaled textures in the viewport and load full resolution only for final renders",
+        default=True,
+    )
+    
+    proxy_size = IntProperty(
+        name="Proxy Size",
+        description="Longest edge in pixels of viewport proxy textures",
+        default=512,
+        min=64,
+        max=2048,
+    )
 
 
 class MIKTOS_OT_connect_agent(Operator):
@@ -147,14 +1164,19 @@ class MIKTOS_OT_connect_agent(Operator):
         
         try:
             # Test connection to Miktos Agent
-            response = requests.get(f"{prefs.miktos_agent_url}/health", timeout=5)
+            session = get_agent_session(prefs)
+            response = session.get(f"{prefs.miktos_agent_url}/health", timeout=5)
             
             if response.status_code == 200:
                 miktos_agent_connected = True
-                self.report({'INFO'}, "Successfully connected to Miktos Agent!")
+                via = " via local daemon" if session is not requests else ""
+                self.report({'INFO'}, f"Successfully connected to Miktos Agent{via}!")
                 
                 # Start WebSocket connection for real-time updates
-                self.start_websocket_connection(prefs.websocket_url)
+                if session is not requests and miktos_daemon.daemon_available(websocket_url=prefs.websocket_url):
+                    self.start_daemon_subscription()
+                else:
+                    self.start_websocket_connection(prefs.websocket_url)
                 
             else:
                 miktos_agent_connected = False
@@ -181,6 +1203,17 @@ class MIKTOS_OT_connect_agent(Operator):
         thread = threading.Thread(target=websocket_thread, daemon=True)
         thread.start()
     
+    def start_daemon_subscription(self):
+        """Receive the daemon's shared WebSocket updates in a background thread"""
+        def subscription_thread():
+            try:
+                miktos_daemon.subscribe(lambda message: self.on_websocket_message(None, message))
+            except Exception as e:
+                print(f"Daemon subscription error: {e}")
+        
+        thread = threading.Thread(target=subscription_thread, daemon=True)
+        thread.start()
+    
     def on_websocket_message(self, ws, message):
         """Handle WebSocket status messages"""
         global generation_progress, generation_status, current_task_id
@@ -188,6 +1221,11 @@ class MIKTOS_OT_connect_agent(Operator):
         try:
             data = json.loads(message)
             
+            if data.get("type") == "preview":
+                if current_task_id and data.get("task_id") == current_task_id:
+                    receive_preview_frame(data)
+                return
+            
             # Update progress for current task
             if current_task_id and "task_updates" in data:
                 for task in data["task_updates"]:
@@ -226,32 +1264,14 @@ class MIKTOS_OT_generate_content(Operator):
         # Get properties
         props = context.scene.miktos_content_props
         prefs = context.preferences.addons[__name__].preferences
-        
-        # Prepare workflow data
-        workflow_data = {
-            "workflow_type": "Basic 3D Content" if props.workflow_type == "basic_content" else "Advanced 3D Scene",
-            "parameters": {
-                "prompt": props.prompt,
-                "negative_prompt": props.negative_prompt,
-                "width": props.width,
-                "height": props.height,
-                "steps": props.steps,
-                "cfg": props.cfg,
-            },
-            "blender_info": {
-                "blender_version": f"{bpy.app.version[0]}.{bpy.app.version[1]}",
-                "render_engine": context.scene.render.engine,
-                "selected_objects": len([obj for obj in context.selected_objects if obj.type == 'MESH'])
-            }
-        }
+        mesh_objects = [obj for obj in context.selected_objects if obj.type == 'MESH']
         
         try:
-            # Execute workflow via Blender-specific endpoint
-            response = requests.post(
-                f"{prefs.miktos_agent_url}/api/v1/blender/generate-content",
-                json=workflow_data,
-                timeout=10
-            )
+            session = get_agent_session(prefs)
+            # Forget the previous task first so its late preview frames are not shown for this one
+            current_task_id = None
+            reset_previews(props.preview_interval, props.show_previews and props.auto_apply)
+            response = submit_generation(prefs.miktos_agent_url, context.scene, props, mesh_objects, session)
             
             if response.status_code == 200:
                 result = response.json()
@@ -261,7 +1281,7 @@ class MIKTOS_OT_generate_content(Operator):
                 self.report({'INFO'}, f"3D content generation started! Task ID: {current_task_id}")
                 
                 # Start monitoring progress
-                self.monitor_progress(context, prefs.miktos_agent_url, current_task_id)
+                self.monitor_progress(context, prefs.miktos_agent_url, current_task_id, session)
                 
             else:
                 self.report({'ERROR'}, f"Failed to start generation: {response.text}")
@@ -271,32 +1291,29 @@ class MIKTOS_OT_generate_content(Operator):
             
         return {'FINISHED'}
     
-    def monitor_progress(self, context, miktos_agent_url, task_id):
+    def monitor_progress(self, context, miktos_agent_url, task_id, session=requests):
         """Monitor generation progress and apply texture when complete"""
-        def progress_thread():
+        def on_update(task_data):
             global generation_status, generation_progress
+            generation_status = task_data.get("status", "unknown")
+            generation_progress = task_data.get("progress", 0.0)
+        
+        def progress_thread():
+            try:
+                task_data = wait_for_task(miktos_agent_url, task_id, session, on_update=on_update)
+            except Exception as e:
+                print(f"Progress monitoring error: {e}")
+                bpy.app.timers.register(restore_preview_materials)
+                return
             
-            while generation_status not in ["completed", "error"]:
-                try:
-                    response = requests.get(f"{miktos_agent_url}/api/v1/task/{task_id}")
-                    if response.status_code == 200:
-                        task_data = response.json()
-                        generation_status = task_data.get("status", "unknown")
-                        generation_progress = task_data.get("progress", 0.0)
-                        
-                        if generation_status == "completed":
-                            # Apply content to scene
-                            if context.scene.miktos_content_props.auto_apply:
-                                bpy.app.timers.register(
-                                    lambda: self.apply_generated_texture(context, task_data)
-                                )
-                            break
-                            
-                    time.sleep(1)
-                    
-                except Exception as e:
-                    print(f"Progress monitoring error: {e}")
-                    break
+            if task_data.get("status") == "completed" and context.scene.miktos_content_props.auto_apply:
+                # Apply content to scene
+                bpy.app.timers.register(
+                    lambda: self.apply_generated_texture(context, task_data)
+                )
+            else:
+                # No final texture is coming, so undo the live preview
+                bpy.app.timers.register(restore_preview_materials)
         
         thread = threading.Thread(target=progress_thread, daemon=True)
         thread.start()
@@ -304,42 +1321,281 @@ class MIKTOS_OT_generate_content(Operator):
     def apply_generated_texture(self, context, task_data):
         """Apply the generated texture to selected objects"""
         try:
-            # For now, create a simple material with the texture info
-            # In a real implementation, this would download and apply the actual texture file
-            
             selected_objects = [obj for obj in context.selected_objects if obj.type == 'MESH']
+            prefs = context.preferences.addons[__name__].preferences
+            apply_task_result(
+                selected_objects, context.scene.miktos_content_props, prefs.miktos_agent_url, task_data,
+                get_agent_session(prefs)
+            )
+            # The final texture replaced the preview; restoring would only touch meshes it missed
+            restore_preview_materials()
+        except Exception as e:
+            print(f"Failed to apply texture: {e}")
+            restore_preview_materials()
+        
+        return None
+
+
+class MIKTOS_OT_generate_sweep(Operator):
+    """Generate a grid of parameter variants in one batched submission"""
+    bl_idname = "miktos.generate_sweep"
+    bl_label = "Generate Parameter Sweep"
+    bl_description = "Submit every combination of the sweep values as one batch and collect the results in a contact sheet"
+    
+    def execute(self, context):
+        global sweep_state
+        
+        if not miktos_agent_connected:
+            self.report({'ERROR'}, "Not connected to Miktos Agent. Click 'Connect' first.")
+            return {'CANCELLED'}
+        
+        props = context.scene.miktos_content_props
+        prefs = context.preferences.addons[__name__].preferences
+        mesh_objects = [obj for obj in context.selected_objects if obj.type == 'MESH']
+        
+        try:
+            variants = build_sweep_variants(props)
+        except ValueError as e:
+            self.report({'ERROR'}, f"Invalid sweep values: {e}")
+            return {'CANCELLED'}
+        
+        if len(variants) > MAX_SWEEP_VARIANTS:
+            self.report({'ERROR'}, f"Sweep has {len(variants)} variants, the limit is {MAX_SWEEP_VARIANTS}")
+            return {'CANCELLED'}
+        
+        workflow_data = build_workflow_data(context.scene, props, mesh_objects)
+        # Variants become standalone materials, so per-object atlas output does not apply
+        workflow_data["parameters"].pop("per_object", None)
+        workflow_data["blender_info"].pop("target_objects", None)
+        workflow_data["variants"] = variants
+        
+        try:
+            session = get_agent_session(prefs)
+            start = time.monotonic()
+            response = session.post(
+                f"{prefs.miktos_agent_url}/api/v1/blender/generate-batch",
+                json=workflow_data,
+                timeout=30
+            )
             
-            if not selected_objects:
-                return None
+            if response.status_code != 200:
+                self.report({'ERROR'}, f"Failed to start sweep: {response.text}")
+                return {'FINISHED'}
             
-            # Create new material
-            material_name = f"Miktos_AI_{int(time.time())}"
-            material = bpy.data.materials.new(name=material_name)
-            material.use_nodes = True
+            result = response.json()
+            batch_id = result.get("batch_id")
             
-            # Get the principled BSDF node
-            nodes = material.node_tree.nodes
-            principled = nodes.get("Principled BSDF")
+        except Exception as e:
+            self.report({'ERROR'}, f"Sweep failed: {str(e)}")
+            return {'FINISHED'}
+        
+        columns, rows, cell_size = contact_sheet_layout(len(variants))
+        sheet = bpy.data.images.new(
+            f"Miktos_Sweep_{batch_id}_Sheet", columns * cell_size, rows * cell_size, alpha=True
+        )
+        sheet.use_fake_user = True
+        
+        sweep_state = {
+            "batch_id": batch_id,
+            "variants": variants,
+            "task_ids": result.get("task_ids", []),
+            "done": 0,
+            "failed": 0,
+            "start": start,
+            "task_seconds": 0.0,
+            "sheet": sheet.name,
+            "sheet_pixels": np.zeros((rows * cell_size, columns * cell_size, 4), dtype=np.float32),
+            "sheet_upload_scheduled": False,
+            "columns": columns,
+            "rows": rows,
+            "cell_size": cell_size,
+        }
+        
+        self.report({'INFO'}, f"Sweep of {len(variants)} variants started! Batch ID: {batch_id}")
+        self.monitor_batch(prefs.miktos_agent_url, sweep_state, session)
+        return {'FINISHED'}
+    
+    def monitor_batch(self, miktos_agent_url, state, session):
+        """Poll the whole batch in one request per second and hand finished variants to the main thread.
+
+        Every variant is eventually handed over: ones the agent never reports
+        (too few tasks, a timeout or repeated poll failures) are marked failed.
+        """
+        def finish(index, task):
+            bpy.app.timers.register(partial(self.apply_variant, miktos_agent_url, state, session, index, task))
+        
+        def batch_thread():
+            finished = set()
+            errors = 0
+            reason = f"Sweep timed out after {SWEEP_TIMEOUT}s"
+            deadline = time.monotonic() + SWEEP_TIMEOUT
             
-            if principled:
-                # Add a note about the generated texture
-                principled.inputs["Base Color"].default_value = (0.8, 0.6, 0.4, 1.0)  # Placeholder color
+            while time.monotonic() < deadline:
+                try:
+                    response = session.get(f"{miktos_agent_url}/api/v1/batch/{state['batch_id']}", timeout=10)
+                    if response.status_code != 200:
+                        raise RuntimeError(f"HTTP {response.status_code}")
+                    tasks = response.json().get("tasks", [])
+                except Exception as e:
+                    errors += 1
+                    print(f"Sweep monitoring error ({errors}/{SWEEP_MAX_POLL_ERRORS}): {e}")
+                    if errors >= SWEEP_MAX_POLL_ERRORS:
+                        reason = f"Sweep monitoring gave up: {e}"
+                        break
+                    time.sleep(1)
+                    continue
                 
-            # Apply material to selected objects
-            for obj in selected_objects:
-                if obj.data.materials:
-                    obj.data.materials[0] = material
-                else:
-                    obj.data.materials.append(material)
+                errors = 0
+                for index, task in enumerate(tasks[:len(state["variants"])]):
+                    if index in finished or task.get("status") not in ["completed", "error"]:
+                        continue
+                    finished.add(index)
+                    finish(index, task)
+                
+                if tasks and len(finished) == min(len(tasks), len(state["variants"])):
+                    reason = "Agent returned no task for this variant"
+                    break
+                
+                time.sleep(1)
             
-            print(f"Applied AI-generated material '{material_name}' to {len(selected_objects)} objects")
+            for index in range(len(state["variants"])):
+                if index not in finished:
+                    finish(index, {"status": "error", "message": reason})
+        
+        thread = threading.Thread(target=batch_thread, daemon=True)
+        thread.start()
+    
+    def apply_variant(self, miktos_agent_url, state, session, index, task):
+        """Create the variant's material and paste it into its own batch's contact sheet.
+
+        state is the batch this task belongs to, so an earlier sweep still
+        finishing never writes into or counts against a newer one.
+        """
+        try:
+            variant = state["variants"][index]
+            # Agents report per-task generation time; summed, it approximates sequential submits
+            state["task_seconds"] += float(task.get("elapsed") or 0.0)
             
+            if task.get("status") != "completed":
+                state["failed"] += 1
+                print(f"Sweep variant {index} failed: {task.get('message')}")
+            else:
+                name = f"Miktos_Sweep_{state['batch_id']}_{index:03d}"
+                image = load_result_image(miktos_agent_url, task.get("result") or {}, name, session)
+                if image:
+                    material = create_image_material(name, image)
+                    material.use_fake_user = True
+                    material["miktos_variant"] = json.dumps(variant)
+                    
+                    if state.get("sheet_pixels") is not None:
+                        paste_contact_sheet_cell(
+                            state["sheet_pixels"], state["columns"], state["rows"], state["cell_size"], index, image
+                        )
+                        # Batch cells that land close together into one upload
+                        if not state["sheet_upload_scheduled"]:
+                            state["sheet_upload_scheduled"] = True
+                            bpy.app.timers.register(
+                                partial(upload_contact_sheet, state), first_interval=SWEEP_UPLOAD_INTERVAL
+                            )
+                    
+                    props = bpy.context.scene.miktos_content_props
+                    if props.use_proxy_textures:
+                        use_viewport_proxies([material], props.proxy_size)
+        
         except Exception as e:
-            print(f"Failed to apply texture: {e}")
+            state["failed"] += 1
+            print(f"Failed to apply sweep variant {index}: {e}")
+        
+        # Count the variant either way so the sweep always reaches completion
+        state["done"] += 1
+        
+        try:
+            if state["done"] == len(state["variants"]):
+                wall = time.monotonic() - state["start"]
+                upload_contact_sheet(state)
+                # The image holds the pixels now; drop the float buffer
+                state["sheet_pixels"] = None
+                sheet = bpy.data.images.get(state["sheet"])
+                if sheet:
+                    sheet.pack()
+                comparison = (
+                    f", sequential generation time {state['task_seconds']:.1f}s"
+                    if state["task_seconds"] else ""
+                )
+                print(
+                    f"Sweep {state['batch_id']} finished: {state['done'] - state['failed']}/{state['done']} "
+                    f"variants in {wall:.1f}s wall time{comparison}"
+                )
+            
+            for area in bpy.context.screen.areas if bpy.context.screen else []:
+                if area.type in ('PROPERTIES', 'IMAGE_EDITOR'):
+                    area.tag_redraw()
+            
+        except Exception as e:
+            print(f"Failed to finish sweep {state['batch_id']}: {e}")
         
         return None
 
 
+class MIKTOS_OT_toggle_full_resolution(Operator):
+    """Toggle full-resolution textures in the viewport for the selected objects"""
+    bl_idname = "miktos.toggle_full_resolution"
+    bl_label = "Toggle Full Resolution"
+    bl_description = "Swap the selected objects' proxy textures for full resolution in the viewport, or back"
+    
+    def execute(self, context):
+        materials = {
+            slot.material for obj in context.selected_objects for slot in obj.material_slots if slot.material
+        }
+        nodes = list(iter_image_nodes(materials))
+        showing_proxies = [node for node in nodes if node.image.get("miktos_full_res")]
+        
+        if showing_proxies:
+            show_full_res(showing_proxies)
+            full_res_pinned.update(node.image.name for node in showing_proxies)
+            evict_full_res(full_res_memory_cap())
+            self.report({'INFO'}, f"Showing {len(showing_proxies)} textures at full resolution")
+        else:
+            full_nodes = [node for node in nodes if node.image.get("miktos_proxy")]
+            full_res_pinned.difference_update(node.image.name for node in full_nodes)
+            show_proxies(full_nodes)
+            self.report({'INFO'}, f"Showing {len(full_nodes)} textures as viewport proxies")
+        
+        return {'FINISHED'}
+
+
+class MIKTOS_OT_measure_scene(Operator):
+    """Report material count, image memory and viewport draw rate"""
+    bl_idname = "miktos.measure_scene"
+    bl_label = "Measure Scene"
+    bl_description = "Report material count, image memory and viewport FPS for before/after comparisons"
+    
+    iterations = IntProperty(
+        name="Redraw Iterations",
+        description="Number of viewport redraws to time",
+        default=20,
+        min=1,
+        max=500,
+    )
+    
+    def execute(self, context):
+        material_count = len(bpy.data.materials)
+        image_memory = image_memory_bytes(image for image in bpy.data.images if image.has_data)
+        
+        start = time.perf_counter()
+        bpy.ops.wm.redraw_timer(type='DRAW_WIN_SWAP', iterations=self.iterations)
+        elapsed = time.perf_counter() - start
+        fps = self.iterations / elapsed if elapsed > 0 else 0.0
+        
+        message = (
+            f"Materials: {material_count}, image memory: {image_memory / 2**20:.1f} MiB, "
+            f"viewport: {fps:.1f} FPS"
+        )
+        print(message)
+        self.report({'INFO'}, message)
+        return {'FINISHED'}
+
+
 class MIKTOS_PT_content_panel(Panel):
     """Main panel for Miktos 3D content generation"""
     bl_label = "Miktos Agent"
@@ -380,6 +1636,9 @@ class MIKTOS_PT_content_panel(Panel):
             
             layout.label(text=f"Status: {generation_status.title()}", icon=icon)
             
+            if generation_status == "executing" and preview_step is not None:
+                layout.label(text=f"Preview: step {preview_step}", icon='IMAGE_DATA')
+            
             if generation_status == "executing":
                 # Progress bar
                 progress_row = layout.row()
@@ -413,6 +1672,40 @@ class MIKTOS_PT_content_panel(Panel):
         
         box.prop(props, "auto_apply")
         
+        row = box.row()
+        row.prop(props, "show_previews")
+        if props.show_previews:
+            row.prop(props, "preview_interval")
+        
+        box.prop(props, "include_geometry_context")
+        box.prop(props, "use_atlas")
+        if props.use_atlas:
+            row = box.row()
+            row.prop(props, "atlas_size")
+            row.prop(props, "atlas_padding")
+        
+        row = box.row()
+        row.prop(props, "use_proxy_textures")
+        if props.use_proxy_textures:
+            row.prop(props, "proxy_size")
+        
+        # Parameter sweep in its own box
+        box = layout.box()
+        box.label(text="Parameter Sweep:")
+        box.prop(props, "sweep_prompts")
+        row = box.row()
+        row.prop(props, "sweep_steps")
+        row.prop(props, "sweep_cfg")
+        box.prop(props, "sweep_seeds")
+        if miktos_agent_connected:
+            box.operator("miktos.generate_sweep", icon='IMGDISPLAY')
+        
+        if sweep_state:
+            box.label(
+                text=f"Sweep: {sweep_state['done']}/{len(sweep_state['variants'])} variants done",
+                icon='CHECKMARK' if sweep_state["done"] == len(sweep_state["variants"]) else 'RENDER_ANIMATION'
+            )
+        
         # Selected objects info
         layout.separator()
         selected_objects = [obj for obj in context.selected_objects if obj.type == 'MESH']
@@ -420,6 +1713,9 @@ class MIKTOS_PT_content_panel(Panel):
             layout.label(text=f"Will apply to {len(selected_objects)} selected objects", icon='OBJECT_DATA')
         else:
             layout.label(text="Select mesh objects to apply content", icon='INFO')
+        
+        layout.operator("miktos.toggle_full_resolution", icon='IMAGE_DATA')
+        layout.operator("miktos.measure_scene", icon='INFO')
 
 
 # Registration
@@ -428,6 +1724,9 @@ classes = [
     Miktos3DContentProperties,
     MIKTOS_OT_connect_agent,
     MIKTOS_OT_generate_content, 
+    MIKTOS_OT_generate_sweep,
+    MIKTOS_OT_toggle_full_resolution,
+    MIKTOS_OT_measure_scene,
     MIKTOS_PT_content_panel,
 ]
 
@@ -439,6 +1738,11 @@ def register():
     # Add properties to scene
     bpy.types.Scene.miktos_content_props = bpy.props.PointerProperty(type=Miktos3DContentProperties)
     
+    # Swap viewport proxies for full-resolution textures around final renders
+    bpy.app.handlers.render_pre.append(miktos_render_pre)
+    bpy.app.handlers.render_complete.append(miktos_render_complete)
+    bpy.app.handlers.render_cancel.append(miktos_render_complete)
+    
     print("Miktos Agent Connector registered successfully!")
 
 def unregister():
@@ -449,6 +1753,14 @@ def unregister():
     # Remove properties from scene
     del bpy.types.Scene.miktos_content_props
     
+    for handlers, handler in [
+        (bpy.app.handlers.render_pre, miktos_render_pre),
+        (bpy.app.handlers.render_complete, miktos_render_complete),
+        (bpy.app.handlers.render_cancel, miktos_render_complete),
+    ]:
+        if handler in handlers:
+            handlers.remove(handler)
+    
     print("Miktos Agent Connector unregistered successfully!")
 
 if __name__ == "__main__":
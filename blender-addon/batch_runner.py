@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Miktos Batch Runner
+Push many .blend files through Miktos Agent generation without a UI
+
+The coordinator reads a manifest, fans jobs out to a pool of headless
+Blender workers and records finished jobs in a checkpoint file so a rerun
+skips them. All workers share one connection budget to the agent.
+
+Usage:
+    python batch_runner.py manifest.json --blender /path/to/blender --workers 4 --max-connections 2
+
+Manifest format:
+    {
+        "agent_url": "http://localhost:8000",
+        "poll_interval": 2.0,
+        "task_timeout": 1800,
+        "defaults": {"width": 1024, "height": 1024, "steps": 20},
+        "jobs": [
+            {
+                "blend": "scenes/robot.blend",
+                "objects": ["Body", "Head"],
+                "prompt": "steampunk robot with brass pipes",
+                "settings": {"use_atlas": true},
+                "output": "out/robot.blend"
+            }
+        ]
+    }
+
+"defaults" and per-job "settings" are Miktos3DContentProperties fields.
+Without "objects" every mesh in the file is targeted; without "output" the
+file is saved in place. Relative paths are resolved against the manifest.
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import secrets
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from multiprocessing.managers import BaseManager
+
+ADDON_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULT_MARKER = "MIKTOS_BATCH_RESULT "
+
+
+class BudgetManager(BaseManager):
+    """Serves the shared connection budget to worker processes"""
+
+
+class ConnectionBudget:
+    """Counting semaphore whose tokens are leased per worker.
+
+    The coordinator releases every token a worker still holds once its process
+    exits and marks the worker dead, so a worker killed mid-request cannot leak
+    part of the budget, and an acquire() it left blocked on the server gives up
+    instead of taking a token nobody will release.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.held = {}
+        self.dead = set()
+        self.condition = threading.Condition()
+
+    def acquire(self, worker_id):
+        with self.condition:
+            while True:
+                if worker_id in self.dead:
+                    raise RuntimeError(f"Worker {worker_id} has exited")
+                if sum(self.held.values()) < self.limit:
+                    break
+                self.condition.wait()
+            self.held[worker_id] = self.held.get(worker_id, 0) + 1
+
+    def release(self, worker_id):
+        with self.condition:
+            count = self.held.get(worker_id, 0)
+            if count <= 1:
+                self.held.pop(worker_id, None)
+            else:
+                self.held[worker_id] = count - 1
+            if count:
+                self.condition.notify()
+
+    def release_all(self, worker_id):
+        with self.condition:
+            self.dead.add(worker_id)
+            self.held.pop(worker_id, None)
+            # Wake everyone: freed tokens go to live waiters, dead waiters give up
+            self.condition.notify_all()
+
+
+def job_key(job):
+    """Stable identity of a job; editing a job in the manifest makes it run again"""
+    return hashlib.sha1(json.dumps(job, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def load_checkpoint(checkpoint_path):
+    """Return the keys of jobs already completed according to the checkpoint file"""
+    completed = set()
+    if not os.path.exists(checkpoint_path):
+        return completed
+
+    with open(checkpoint_path, "r") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A run killed mid-write can leave a partial last line
+                continue
+            if entry.get("status") == "completed":
+                completed.add(entry["key"])
+    return completed
+
+
+def resolve_job(job, manifest_dir):
+    """Make the job's file paths absolute relative to the manifest"""
+    job = dict(job)
+    for field in ("blend", "output"):
+        if job.get(field):
+            job[field] = os.path.normpath(os.path.join(manifest_dir, job[field]))
+    return job
+
+
+def start_budget_server(max_connections):
+    """Serve a ConnectionBudget on localhost and return (budget, address, authkey)"""
+    budget = ConnectionBudget(max_connections)
+    BudgetManager.register("budget", callable=lambda: budget)
+
+    authkey = secrets.token_bytes(16)
+    manager = BudgetManager(address=("127.0.0.1", 0), authkey=authkey)
+    server = manager.get_server()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return budget, server.address, authkey
+
+
+def run_job(job, manifest, args, budget, budget_address, authkey):
+    """Run one job in a worker process and return (succeeded, seconds, result, output)"""
+    worker_job = {
+        "agent_url": manifest.get("agent_url", "http://localhost:8000"),
+        "poll_interval": manifest.get("poll_interval", 1.0),
+        "task_timeout": manifest.get("task_timeout"),
+        "defaults": manifest.get("defaults", {}),
+        "job": job,
+    }
+    env = dict(os.environ)
+    env["MIKTOS_BATCH_JOB"] = json.dumps(worker_job)
+    env["MIKTOS_BATCH_BUDGET"] = f"{budget_address[0]}:{budget_address[1]}"
+    env["MIKTOS_BATCH_AUTHKEY"] = authkey.hex()
+    worker_id = f"{job_key(job)}-{secrets.token_hex(4)}"
+    env["MIKTOS_BATCH_WORKER"] = worker_id
+
+    if args.bpy_module:
+        command = [sys.executable, os.path.abspath(__file__), "--worker"]
+    else:
+        command = [
+            args.blender, "--background", "--factory-startup", job["blend"],
+            "--python-exit-code", "1", "--python", os.path.abspath(__file__), "--", "--worker",
+        ]
+
+    start = time.monotonic()
+    try:
+        completed = subprocess.run(command, env=env, capture_output=True, text=True, timeout=args.job_timeout)
+        output = completed.stdout + completed.stderr
+        succeeded = completed.returncode == 0
+    except subprocess.TimeoutExpired as e:
+        # The partial output is bytes on POSIX even with text=True
+        partial_output = e.stdout or b""
+        if isinstance(partial_output, bytes):
+            partial_output = partial_output.decode("utf-8", errors="replace")
+        output = f"Worker timed out after {args.job_timeout}s\n{partial_output}"
+        succeeded = False
+    finally:
+        # A killed or crashed worker may still hold tokens
+        budget.release_all(worker_id)
+    elapsed = time.monotonic() - start
+
+    result = {}
+    for line in output.splitlines():
+        if line.startswith(RESULT_MARKER):
+            result = json.loads(line[len(RESULT_MARKER):])
+
+    return succeeded and bool(result), elapsed, result, output
+
+
+def run_coordinator(args):
+    """Fan the manifest's pending jobs out to the worker pool"""
+    manifest_path = os.path.abspath(args.manifest)
+    with open(manifest_path, "r") as f:
+        manifest = json.load(f)
+
+    manifest_dir = os.path.dirname(manifest_path)
+    checkpoint_path = args.checkpoint or f"{manifest_path}.progress.jsonl"
+    completed = load_checkpoint(checkpoint_path)
+
+    jobs = [resolve_job(job, manifest_dir) for job in manifest.get("jobs", [])]
+    pending = [job for job in jobs if job_key(job) not in completed]
+    print(f"{len(jobs)} jobs in manifest, {len(jobs) - len(pending)} already completed, {len(pending)} to run")
+    if not pending:
+        return 0
+
+    budget, budget_address, authkey = start_budget_server(args.max_connections)
+    checkpoint_lock = threading.Lock()
+    failures = 0
+    start = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {
+            pool.submit(run_job, job, manifest, args, budget, budget_address, authkey): job
+            for job in pending
+        }
+        for future in as_completed(futures):
+            job = futures[future]
+            succeeded, elapsed, result, output = future.result()
+
+            if not succeeded:
+                failures += 1
+                tail = "\n".join(output.splitlines()[-20:])
+                print(f"FAILED {job['blend']} after {elapsed:.1f}s\n{tail}")
+                continue
+
+            entry = {
+                "key": job_key(job),
+                "blend": job["blend"],
+                "status": "completed",
+                "task_id": result.get("task_id"),
+                "seconds": round(elapsed, 2),
+            }
+            with checkpoint_lock:
+                with open(checkpoint_path, "a") as f:
+                    f.write(json.dumps(entry) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+            print(f"Completed {job['blend']} in {elapsed:.1f}s (task {entry['task_id']})")
+
+    print(
+        f"Batch finished in {time.monotonic() - start:.1f}s: "
+        f"{len(pending) - failures} completed, {failures} failed"
+    )
+    return 1 if failures else 0
+
+
+def load_addon():
+    """Import the addon package from this directory and register it"""
+    spec = importlib.util.spec_from_file_location(
+        "miktos_agent_connector",
+        os.path.join(ADDON_DIR, "__init__.py"),
+        submodule_search_locations=[ADDON_DIR],
+    )
+    addon = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = addon
+    spec.loader.exec_module(addon)
+    addon.register()
+    return addon
+
+
+def make_budgeted_session(budget, worker_id):
+    """requests.Session that holds a token from the shared budget for every request"""
+    import requests
+
+    class BudgetedSession(requests.Session):
+        def request(self, *args, **kwargs):
+            budget.acquire(worker_id)
+            try:
+                return super().request(*args, **kwargs)
+            finally:
+                budget.release(worker_id)
+
+    return BudgetedSession()
+
+
+def pack_temporary_images(bpy):
+    """Pack images that would not survive the worker: temp-dir files and unsaved generated images"""
+    temp_dirs = [os.path.abspath(path) for path in (bpy.app.tempdir, tempfile.gettempdir()) if path]
+
+    for image in bpy.data.images:
+        if image.packed_file:
+            continue
+        if image.source == 'GENERATED' and image.is_dirty:
+            image.pack()
+        elif image.source == 'FILE':
+            path = os.path.abspath(bpy.path.abspath(image.filepath))
+            if any(os.path.commonpath([path, temp_dir]) == temp_dir for temp_dir in temp_dirs):
+                image.pack()
+
+
+def run_worker():
+    """Generate and apply content for one .blend file inside Blender"""
+    import bpy
+
+    worker_job = json.loads(os.environ["MIKTOS_BATCH_JOB"])
+    job = worker_job["job"]
+    agent_url = worker_job["agent_url"]
+
+    if bpy.data.filepath != job["blend"]:
+        bpy.ops.wm.open_mainfile(filepath=job["blend"])
+
+    addon = load_addon()
+
+    host, port = os.environ["MIKTOS_BATCH_BUDGET"].rsplit(":", 1)
+    BudgetManager.register("budget")
+    manager = BudgetManager(address=(host, int(port)), authkey=bytes.fromhex(os.environ["MIKTOS_BATCH_AUTHKEY"]))
+    manager.connect()
+    session = make_budgeted_session(manager.budget(), os.environ["MIKTOS_BATCH_WORKER"])
+
+    scene = bpy.context.scene
+    props = scene.miktos_content_props
+    settings = dict(worker_job.get("defaults", {}))
+    settings.update(job.get("settings", {}))
+    if job.get("prompt"):
+        settings["prompt"] = job["prompt"]
+    for name, value in settings.items():
+        prop = props.bl_rna.properties.get(name)
+        if prop is None:
+            raise RuntimeError(f"Unknown setting '{name}'")
+        if prop.type == 'ENUM':
+            # Manifests naturally write e.g. "atlas_size": 4096
+            value = str(value)
+        try:
+            setattr(props, name, value)
+        except (TypeError, ValueError) as e:
+            raise RuntimeError(f"Invalid value {value!r} for setting '{name}': {e}")
+
+    if job.get("objects"):
+        missing = [name for name in job["objects"] if name not in bpy.data.objects]
+        if missing:
+            raise RuntimeError(f"Objects not found in {job['blend']}: {', '.join(missing)}")
+        objects = [bpy.data.objects[name] for name in job["objects"]]
+    else:
+        objects = list(scene.objects)
+    objects = [obj for obj in objects if obj.type == 'MESH']
+    if not objects:
+        raise RuntimeError(f"No mesh objects to process in {job['blend']}")
+
+    response = addon.submit_generation(agent_url, scene, props, objects, session)
+    if response.status_code != 200:
+        raise RuntimeError(f"Failed to start generation: HTTP {response.status_code} {response.text}")
+    task_id = response.json().get("task_id")
+    print(f"Started task {task_id} for {len(objects)} objects in {job['blend']}")
+
+    task_data = addon.wait_for_task(
+        agent_url, task_id, session,
+        poll_interval=worker_job.get("poll_interval", 1.0),
+        timeout=worker_job.get("task_timeout"),
+    )
+    if task_data.get("status") != "completed":
+        raise RuntimeError(f"Task {task_id} failed: {task_data.get('message')}")
+
+    materials = addon.apply_task_result(objects, props, agent_url, task_data, session)
+    pack_temporary_images(bpy)
+
+    if job.get("output"):
+        os.makedirs(os.path.dirname(job["output"]), exist_ok=True)
+        bpy.ops.wm.save_as_mainfile(filepath=job["output"])
+    else:
+        bpy.ops.wm.save_mainfile()
+
+    print(RESULT_MARKER + json.dumps({
+        "task_id": task_id,
+        "materials": [material.name for material in materials],
+    }))
+
+
+def main():
+    # Blender passes script arguments after "--"
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+
+    if "--worker" in argv:
+        run_worker()
+        return
+
+    parser = argparse.ArgumentParser(description="Run Miktos generation over many .blend files")
+    parser.add_argument("manifest", help="JSON manifest of files, objects and prompts")
+    parser.add_argument("--blender", default="blender", help="Blender executable used for workers")
+    parser.add_argument("--bpy-module", action="store_true",
+                        help="Run workers with this Python and the bpy module instead of Blender")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Number of worker processes")
+    parser.add_argument("--max-connections", type=int, default=2,
+                        help="Concurrent HTTP requests to the agent shared by all workers")
+    parser.add_argument("--checkpoint", help="Progress file (default: <manifest>.progress.jsonl)")
+    parser.add_argument("--job-timeout", type=float, default=None, help="Seconds before a worker is killed")
+    sys.exit(run_coordinator(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
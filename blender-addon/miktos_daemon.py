@@ -0,0 +1,554 @@
+#!/usr/bin/env python3
+"""
+Miktos Local Daemon
+One upstream connection to the Miktos Agent shared by every Blender on this machine
+
+The daemon keeps a small pooled HTTP session and a single /ws/blender
+WebSocket to the agent. Local Blender instances talk to it over a Unix
+socket: HTTP requests are replayed on the shared pool (identical in-flight
+GETs are coalesced and answered from a short cache), and WebSocket status
+traffic is deduplicated before being fanned out to subscribers. The addon
+detects the socket automatically and falls back to direct connections when
+the daemon is not running.
+
+Protocol: newline-delimited JSON over the Unix socket.
+    {"op": "ping"}                          -> {"ok": true, "agent_url", "websocket_url"}
+    {"op": "stats"}                         -> {"stats": {...}}
+    {"op": "request", "method", "url", "headers", "body_b64"}
+                                            -> {"status", "headers", "body_b64"} or {"error"}
+    {"op": "subscribe"}                     -> stream of {"op": "message", "data": "<ws text>"}
+
+Usage:
+    python miktos_daemon.py serve --agent-url http://localhost:8000
+    python miktos_daemon.py stats
+    python miktos_daemon.py bench --clients 8 --seconds 30 [--task-id <id> ...] [--shared]
+"""
+
+import argparse
+import base64
+import json
+import os
+import signal
+import socket
+import queue
+import socketserver
+import stat
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+
+def default_socket_path():
+    """Per-user socket path shared by the daemon and the addon, inside a private 0700 directory"""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    user = os.getuid() if hasattr(os, "getuid") else os.environ.get("USERNAME", "user")
+    return os.path.join(runtime_dir, f"miktos-agent-{user}", "agent.sock")
+
+
+def check_socket_owner(socket_path):
+    """Refuse sockets (or socket directories) that another user could have planted or replaced"""
+    if not hasattr(os, "getuid"):
+        return
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    dir_stat = os.stat(directory)
+    if dir_stat.st_uid != os.getuid() or dir_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(f"{directory} must be owned by the current user and not writable by others")
+    if os.stat(socket_path).st_uid != os.getuid():
+        raise PermissionError(f"{socket_path} is owned by another user")
+
+
+def send_message(sock_file, message):
+    sock_file.write(json.dumps(message).encode("utf-8") + b"\n")
+    sock_file.flush()
+
+
+def read_message(sock_file):
+    line = sock_file.readline()
+    if not line:
+        raise ConnectionError("Daemon closed the connection")
+    return json.loads(line)
+
+
+def daemon_call(message, socket_path=None, timeout=None):
+    """Send one message to the daemon and return its reply"""
+    socket_path = socket_path or default_socket_path()
+    check_socket_owner(socket_path)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+        with sock.makefile("rwb") as sock_file:
+            send_message(sock_file, message)
+            return read_message(sock_file)
+    finally:
+        sock.close()
+
+
+def daemon_available(socket_path=None, agent_url=None, websocket_url=None):
+    """True if a daemon answers on the socket and, when given, proxies the same agent URLs"""
+    socket_path = socket_path or default_socket_path()
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        return False
+    try:
+        reply = daemon_call({"op": "ping"}, socket_path, timeout=1)
+    except (OSError, ValueError):
+        return False
+
+    for key, expected in (("agent_url", agent_url), ("websocket_url", websocket_url)):
+        if expected and (reply.get(key) or "").rstrip("/") != expected.rstrip("/"):
+            return False
+    return reply.get("ok", False)
+
+
+class DaemonSession:
+    """requests-compatible session that sends requests through the local daemon"""
+
+    def __init__(self, socket_path=None):
+        self.socket_path = socket_path or default_socket_path()
+
+    def request(self, method, url, timeout=None, **kwargs):
+        prepared = requests.Request(method.upper(), url, **kwargs).prepare()
+        body = prepared.body or b""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+
+        reply = daemon_call({
+            "op": "request",
+            "method": prepared.method,
+            "url": prepared.url,
+            "headers": dict(prepared.headers),
+            "body_b64": base64.b64encode(body).decode("ascii"),
+            "timeout": timeout,
+        }, self.socket_path, timeout=timeout)
+
+        if "error" in reply:
+            raise requests.ConnectionError(reply["error"])
+
+        response = requests.Response()
+        response.status_code = reply["status"]
+        response.headers = CaseInsensitiveDict(reply["headers"])
+        response._content = base64.b64decode(reply["body_b64"])
+        response.url = prepared.url
+        response.request = prepared
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+
+def subscribe(on_message, socket_path=None):
+    """Stream WebSocket messages from the daemon to on_message until the connection drops"""
+    socket_path = socket_path or default_socket_path()
+    check_socket_owner(socket_path)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(socket_path)
+    try:
+        with sock.makefile("rwb") as sock_file:
+            send_message(sock_file, {"op": "subscribe"})
+            while True:
+                message = read_message(sock_file)
+                if message.get("op") == "message":
+                    on_message(message["data"])
+    finally:
+        sock.close()
+
+
+class Subscriber:
+    """One subscribed client with its own bounded queue and writer thread
+
+    A slow or stalled client only fills its own queue; once it is full the
+    subscriber is dropped instead of holding up delivery to everyone else.
+    """
+
+    queue_size = 256
+
+    def __init__(self, connection, sock_file):
+        self.connection = connection
+        self.sock_file = sock_file
+        self.queue = queue.Queue(maxsize=self.queue_size)
+        self.closed = threading.Event()
+        self.thread = threading.Thread(target=self.write_loop, daemon=True)
+        self.thread.start()
+
+    def offer(self, message):
+        """Queue a message without blocking; False if the subscriber is closed or too far behind"""
+        if self.closed.is_set():
+            return False
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            self.close()
+            return False
+        return True
+
+    def write_loop(self):
+        while not self.closed.is_set():
+            message = self.queue.get()
+            if message is None:
+                break
+            try:
+                send_message(self.sock_file, message)
+            except OSError:
+                break
+        self.close()
+
+    def close(self):
+        if self.closed.is_set():
+            return
+        self.closed.set()
+        try:
+            # Unblocks both the handler's readline and a writer stuck in send
+            self.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            self.queue.put_nowait(None)
+        except queue.Full:
+            pass
+
+
+class Upstream:
+    """Shared HTTP pool, WebSocket and subscriber fan-out"""
+
+    def __init__(self, agent_url, websocket_url, http_connections, cache_ttl):
+        self.agent_url = agent_url
+        self.websocket_url = websocket_url
+        self.cache_ttl = cache_ttl
+
+        self.session = requests.Session()
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=http_connections, pool_block=True)
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.cache = {}
+        self.subscribers = []
+        self.websocket_thread = None
+
+        # Last forwarded (status, progress) per task and last non-task status payload
+        self.task_state = {}
+        self.last_status = None
+
+        self.started = time.time()
+        self.stats = {
+            "client_requests": 0,
+            "upstream_requests": 0,
+            "coalesced_requests": 0,
+            "cache_hits": 0,
+            "websocket_connections": 0,
+            "websocket_messages": 0,
+            "messages_forwarded": 0,
+            "messages_dropped": 0,
+            "subscribers_dropped": 0,
+        }
+
+    def count(self, key, amount=1):
+        with self.lock:
+            self.stats[key] += amount
+
+    def snapshot(self):
+        pools = self.adapter.poolmanager.pools
+        with self.lock:
+            stats = dict(self.stats)
+            stats["subscribers"] = len(self.subscribers)
+        stats["upstream_http_connections"] = sum(pools[key].num_connections for key in list(pools.keys()))
+        stats["uptime"] = round(time.time() - self.started, 1)
+        stats["upstream_request_rate"] = round(stats["upstream_requests"] / max(stats["uptime"], 1e-6), 2)
+        return stats
+
+    def request(self, message):
+        """Replay a client request upstream; identical GETs share one in-flight request and a short cache"""
+        self.count("client_requests")
+        method = message["method"]
+        url = message["url"]
+        body = base64.b64decode(message.get("body_b64") or "")
+
+        if method != "GET" or body:
+            return self.send_upstream(method, url, message.get("headers"), body, message.get("timeout"))
+
+        with self.lock:
+            cached = self.cache.get(url)
+            if cached and time.monotonic() - cached[0] < self.cache_ttl:
+                self.stats["cache_hits"] += 1
+                return cached[1]
+
+            waiter = self.in_flight.get(url)
+            if waiter is None:
+                waiter = self.in_flight[url] = {"event": threading.Event(), "reply": None}
+                owner = True
+            else:
+                self.stats["coalesced_requests"] += 1
+                owner = False
+
+        if not owner:
+            waiter["event"].wait()
+            return waiter["reply"]
+
+        reply = {"error": "Upstream request failed"}
+        try:
+            reply = self.send_upstream(method, url, message.get("headers"), body, message.get("timeout"))
+        finally:
+            # Always wake coalesced waiters, even if the upstream call raised
+            with self.lock:
+                now = time.monotonic()
+                self.cache = {key: value for key, value in self.cache.items() if now - value[0] < self.cache_ttl}
+                if reply.get("status") == 200:
+                    self.cache[url] = (now, reply)
+                del self.in_flight[url]
+            waiter["reply"] = reply
+            waiter["event"].set()
+        return reply
+
+    def send_upstream(self, method, url, headers, body, timeout):
+        self.count("upstream_requests")
+        try:
+            response = self.session.request(method, url, headers=headers, data=body or None, timeout=timeout)
+        except requests.RequestException as e:
+            return {"error": str(e)}
+        return {
+            "status": response.status_code,
+            "headers": dict(response.headers),
+            "body_b64": base64.b64encode(response.content).decode("ascii"),
+        }
+
+    def add_subscriber(self, subscriber):
+        with self.lock:
+            self.subscribers.append(subscriber)
+            if self.websocket_thread is None:
+                self.websocket_thread = threading.Thread(target=self.run_websocket, daemon=True)
+                self.websocket_thread.start()
+
+    def remove_subscriber(self, subscriber):
+        subscriber.close()
+        with self.lock:
+            if subscriber in self.subscribers:
+                self.subscribers.remove(subscriber)
+
+    def run_websocket(self):
+        """Keep one upstream WebSocket open, reconnecting with backoff"""
+        import websocket
+
+        delay = 1.0
+        while True:
+            self.count("websocket_connections")
+            connected_at = time.monotonic()
+            ws = websocket.WebSocketApp(self.websocket_url, on_message=self.on_websocket_message)
+            ws.run_forever()
+            if time.monotonic() - connected_at > 30:
+                delay = 1.0
+            time.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    def dedupe(self, text):
+        """Return the message to forward, or None if it repeats what subscribers already have"""
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return text
+        if not isinstance(data, dict) or "type" in data:
+            # Typed messages (e.g. previews) are events, not status snapshots
+            return text
+
+        with self.lock:
+            changed = []
+            for task in data.get("task_updates", []):
+                state = (task.get("status"), task.get("progress"))
+                if self.task_state.get(task.get("task_id")) != state:
+                    self.task_state[task.get("task_id")] = state
+                    changed.append(task)
+
+            status = {key: value for key, value in data.items() if key != "task_updates"}
+            if not changed and status == self.last_status:
+                return None
+            self.last_status = status
+
+        if "task_updates" in data:
+            data["task_updates"] = changed
+        return json.dumps(data)
+
+    def on_websocket_message(self, ws, text):
+        self.count("websocket_messages")
+        forwarded = self.dedupe(text)
+        if forwarded is None:
+            self.count("messages_dropped")
+            return
+
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            if subscriber.offer({"op": "message", "data": forwarded}):
+                self.count("messages_forwarded")
+            else:
+                self.count("subscribers_dropped")
+                self.remove_subscriber(subscriber)
+
+
+class DaemonHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        upstream = self.server.upstream
+        try:
+            message = read_message(self.rfile)
+        except (ConnectionError, ValueError):
+            return
+
+        op = message.get("op")
+        if op == "ping":
+            send_message(self.wfile, {
+                "ok": True,
+                "agent_url": upstream.agent_url,
+                "websocket_url": upstream.websocket_url,
+            })
+        elif op == "stats":
+            send_message(self.wfile, {"stats": upstream.snapshot()})
+        elif op == "request":
+            send_message(self.wfile, upstream.request(message))
+        elif op == "subscribe":
+            subscriber = Subscriber(self.connection, self.wfile)
+            upstream.add_subscriber(subscriber)
+            try:
+                # Hold the connection open until the client goes away or is dropped
+                while self.rfile.readline():
+                    pass
+            except OSError:
+                pass
+            finally:
+                upstream.remove_subscriber(subscriber)
+        else:
+            send_message(self.wfile, {"error": f"Unknown op: {op}"})
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    # Every local request is its own connection, so allow bursts from many clients
+    request_queue_size = 128
+
+
+def serve(args):
+    socket_path = args.socket
+    os.makedirs(os.path.dirname(os.path.abspath(socket_path)), mode=0o700, exist_ok=True)
+    if os.path.exists(socket_path):
+        if daemon_available(socket_path):
+            print(f"A daemon is already listening on {socket_path}")
+            return 1
+        os.unlink(socket_path)
+
+    websocket_url = args.websocket_url or args.agent_url.replace("http", "ws", 1) + "/ws/blender"
+    # Create the socket owner-only from the start rather than tightening it after bind
+    old_umask = os.umask(0o077)
+    try:
+        server = DaemonServer(socket_path, DaemonHandler)
+    finally:
+        os.umask(old_umask)
+    try:
+        check_socket_owner(socket_path)
+    except PermissionError as e:
+        server.server_close()
+        os.unlink(socket_path)
+        print(f"Refusing to serve: {e}")
+        return 1
+    server.upstream = Upstream(args.agent_url, websocket_url, args.http_connections, args.cache_ttl)
+
+    print(f"Miktos daemon listening on {socket_path} -> {args.agent_url}")
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.unlink(socket_path)
+    return 0
+
+
+def print_stats(args):
+    stats = daemon_call({"op": "stats"}, args.socket, timeout=5)["stats"]
+    print(json.dumps(stats, indent=2))
+    return 0
+
+
+def bench(args):
+    """Simulate several Blender instances polling through the daemon and report upstream load
+
+    By default every client polls its own task, as separate Blender instances
+    running separate generations would, so coalescing only helps when polls
+    happen to overlap. --shared has every client poll the same URL, which is
+    the best case for coalescing and caching and overstates the typical saving.
+    """
+    if args.shared:
+        paths = [f"/api/v1/task/{args.task_id[0]}" if args.task_id else "/health"] * args.clients
+    else:
+        task_ids = args.task_id or [f"bench-{index}" for index in range(args.clients)]
+        paths = [f"/api/v1/task/{task_ids[index % len(task_ids)]}" for index in range(args.clients)]
+    before = daemon_call({"op": "stats"}, args.socket, timeout=5)["stats"]
+    stop = threading.Event()
+    client_requests = [0] * args.clients
+
+    def client(index):
+        threading.Thread(target=subscribe, args=(lambda data: None, args.socket), daemon=True).start()
+        session = DaemonSession(args.socket)
+        while not stop.is_set():
+            session.get(f"{args.agent_url}{paths[index]}", timeout=10)
+            client_requests[index] += 1
+            stop.wait(args.poll_interval)
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    after = daemon_call({"op": "stats"}, args.socket, timeout=5)["stats"]
+    upstream = after["upstream_requests"] - before["upstream_requests"]
+    mode = f"the same URL ({paths[0]}, best case)" if args.shared else f"{len(set(paths))} distinct tasks"
+    print(f"{args.clients} clients polling {mode} every {args.poll_interval}s for {args.seconds}s")
+    print(f"  client requests:        {sum(client_requests)} ({sum(client_requests) / args.seconds:.2f}/s)")
+    print(f"  upstream requests:      {upstream} ({upstream / args.seconds:.2f}/s)")
+    print(f"  upstream HTTP conns:    {after['upstream_http_connections']}")
+    print(f"  upstream WebSockets:    {after['websocket_connections']}")
+    print(f"  ws messages dropped:    {after['messages_dropped'] - before['messages_dropped']}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local multiplexing daemon for the Miktos Agent")
+    parser.add_argument("--socket", default=default_socket_path(), help="Unix socket path")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="Run the daemon")
+    serve_parser.add_argument("--agent-url", default="http://localhost:8000")
+    serve_parser.add_argument("--websocket-url", help="Default: <agent-url>/ws/blender")
+    serve_parser.add_argument("--http-connections", type=int, default=2, help="Upstream HTTP pool size")
+    serve_parser.add_argument("--cache-ttl", type=float, default=0.5, help="Seconds to reuse identical GET responses")
+    serve_parser.set_defaults(func=serve)
+
+    stats_parser = commands.add_parser("stats", help="Print daemon counters")
+    stats_parser.set_defaults(func=print_stats)
+
+    bench_parser = commands.add_parser("bench", help="Measure upstream load with several local clients")
+    bench_parser.add_argument("--agent-url", default="http://localhost:8000")
+    bench_parser.add_argument("--clients", type=int, default=8)
+    bench_parser.add_argument("--seconds", type=float, default=30.0)
+    bench_parser.add_argument("--poll-interval", type=float, default=1.0)
+    bench_parser.add_argument("--task-id", action="append",
+                              help="Task to poll; repeat to spread clients over several (default: one synthetic task per client)")
+    bench_parser.add_argument("--shared", action="store_true",
+                              help="Have every client poll the same URL (best case for coalescing; default URL /health)")
+    bench_parser.set_defaults(func=bench)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Batch Runner Tests
+Unit tests for the shared connection budget; runs without Blender
+"""
+
+import threading
+import unittest
+
+from batch_runner import ConnectionBudget
+
+
+class ConnectionBudgetTest(unittest.TestCase):
+    def test_release_all_frees_tokens_of_exited_worker(self):
+        budget = ConnectionBudget(1)
+        budget.acquire("A")
+        budget.release_all("A")
+
+        budget.acquire("B")
+        self.assertEqual(budget.held, {"B": 1})
+
+    def test_blocked_acquire_of_exited_worker_gives_up(self):
+        budget = ConnectionBudget(1)
+        budget.acquire("A")
+
+        errors = []
+
+        def acquire_b():
+            try:
+                budget.acquire("B")
+            except RuntimeError as e:
+                errors.append(e)
+
+        blocked = threading.Thread(target=acquire_b)
+        blocked.start()
+        blocked.join(0.1)
+        self.assertTrue(blocked.is_alive())
+
+        # B is killed while waiting, then A finishes its request
+        budget.release_all("B")
+        budget.release("A")
+        blocked.join(1)
+
+        self.assertFalse(blocked.is_alive())
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(budget.held, {})
+
+        acquired = threading.Event()
+        threading.Thread(target=lambda: (budget.acquire("C"), acquired.set()), daemon=True).start()
+        self.assertTrue(acquired.wait(1))
+
+    def test_waiter_gets_token_on_release(self):
+        budget = ConnectionBudget(1)
+        budget.acquire("A")
+
+        acquired = threading.Event()
+        threading.Thread(target=lambda: (budget.acquire("B"), acquired.set()), daemon=True).start()
+        self.assertFalse(acquired.wait(0.1))
+
+        budget.release("A")
+        self.assertTrue(acquired.wait(1))
+        self.assertEqual(budget.held, {"B": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()